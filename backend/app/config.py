@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -14,6 +14,13 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    AUTO_MIGRATE: bool = False  # Run init_db on app startup; only safe with a single process
+    
+    # Production server (gunicorn.conf.py)
+    WORKERS: int = 1
+    WORKER_THREADS: Optional[int] = None  # torch/OpenMP/MKL threads per worker, default cpu_count // WORKERS
+    WORKER_TIMEOUT: int = 120
+    PRELOAD_OCR_MODELS: bool = True  # Load EasyOCR in the master so workers share its pages
     
     # CORS
     FRONTEND_URL: str = "http://localhost:3000"
@@ -21,6 +28,30 @@ class Settings(BaseSettings):
     # OCR
     OCR_LANGUAGES: List[str] = ["en"]
     
+    # Ingredient knowledge base
+    INGREDIENT_VOCAB_PATH: str = "data/ingredient_vocab.bin"
+    INGREDIENT_IMPORT_BATCH_SIZE: int = 5000
+    
+    # Analysis history retention
+    ANALYSIS_RETENTION_DAYS: int = 90
+    ANALYSIS_RETENTION_BATCH_SIZE: int = 1000
+    ANALYSIS_RETENTION_ARCHIVE: bool = True  # False deletes cold rows without archiving
+    ANALYSIS_ARCHIVE_DIR: str = "data/archive"
+    ANALYSIS_RETENTION_PAUSE_SECONDS: float = 0.0  # Sleep between batches
+    
+    # Profiling (opt-in)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.01  # Fraction of requests captured at random
+    PROFILING_SLOW_REQUEST_MS: float = 2000  # Always capture requests slower than this, 0 disables
+    PROFILING_INTERVAL_MS: float = 10  # Stack sampling interval
+    PROFILING_BUFFER_SECONDS: float = 120  # Sample history kept, bounds the longest capturable request
+    PROFILING_OUTPUT_DIR: str = "data/profiles"
+    PROFILING_ALL_THREADS: bool = False  # Also sample threadpool threads, not just the event loop
+    PROFILING_MAX_CAPTURES: int = 50  # Captures kept on disk; older ones are deleted
+    
+    # Admin
+    ADMIN_TOKEN: str = ""  # Required as X-Admin-Token on /api/admin; endpoints are disabled when empty
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
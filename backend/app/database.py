@@ -1,3 +1,4 @@
+import os
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -8,6 +9,22 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def init_db():
+    """
+    Create any missing tables, then apply migrations for columns and indexes
+    added to tables that already existed. Run once per deployment rather
+    than per worker.
+    """
+    from alembic import command
+    from alembic.config import Config
+    from app.models import models  # noqa: F401 - registers the tables on Base
+
+    Base.metadata.create_all(bind=engine)
+    command.upgrade(Config(ALEMBIC_INI), "head")
+
 
 def get_db():
     db = SessionLocal()
@@ -1,12 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import engine, Base
-from app.routes import analysis, user
+from app.database import init_db
+from app.routes import admin, analysis, user
 from app.schemas.schemas import HealthStatus
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from app.services.ingredient_vocab import ingredient_vocab
+from app.services.profiling_service import profiling_service, profiling_middleware
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -26,9 +25,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profiling middleware (opt-in via PROFILING_ENABLED)
+if profiling_service.enabled:
+    app.middleware("http")(profiling_middleware)
+
+
+@app.on_event("startup")
+async def create_tables():
+    """Create database tables on startup, opt-in for a single dev process"""
+    if settings.AUTO_MIGRATE:
+        init_db()
+
+
+@app.on_event("startup")
+async def load_ingredient_vocab():
+    """Map the ingredient vocabulary snapshot, if one has been exported"""
+    if ingredient_vocab.load():
+        print(f"Loaded {len(ingredient_vocab)} ingredient lookup keys")
+
+
+@app.on_event("startup")
+async def start_profiler():
+    """Start the stack sampler when profiling is enabled"""
+    profiling_service.start()
+
+
+@app.on_event("shutdown")
+async def stop_profiler():
+    profiling_service.stop()
+
+
 # Include routers
 app.include_router(analysis.router, prefix="/api/analysis", tags=["Analysis"])
 app.include_router(user.router, prefix="/api/user", tags=["User"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 @app.get("/", response_model=HealthStatus)
@@ -9,6 +9,7 @@ class Ingredient(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), unique=True, index=True, nullable=False)
     common_names = Column(JSON, default=[])  # Alternative names
+    lookup_keys = Column(JSON, default=[])  # Normalized name + common names for matching
     category = Column(String(100))  # e.g., "preservative", "colorant", "fragrance"
     description = Column(Text)
     safety_rating = Column(String(50))  # "safe", "moderate", "concerning"
@@ -41,4 +42,4 @@ class AnalysisHistory(Base):
     ingredients_found = Column(JSON, default=[])
     analysis_result = Column(JSON)  # Full analysis result
     confidence_score = Column(Float)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -0,0 +1,43 @@
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from app.config import settings
+from app.services.profiling_service import profiling_service
+
+router = APIRouter()
+
+
+def verify_admin(x_admin_token: Optional[str] = Header(None)):
+    """Require the X-Admin-Token header; admin endpoints are off without ADMIN_TOKEN"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not secrets.compare_digest((x_admin_token or "").encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/profiles", dependencies=[Depends(verify_admin)])
+async def list_profiles():
+    """List recent request profile captures, newest first"""
+    if not profiling_service.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+    return {"captures": profiling_service.recent_captures()}
+
+
+@router.get(
+    "/profiles/{capture_id}",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(verify_admin)]
+)
+async def get_profile(capture_id: str):
+    """Get the folded stacks of a capture, ready for flamegraph.pl or speedscope"""
+    if not profiling_service.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+    folded = profiling_service.read_folded(capture_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return folded
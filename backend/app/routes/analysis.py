@@ -9,6 +9,7 @@ from app.models.models import AnalysisHistory, UserPreference
 from app.schemas.schemas import AnalysisRequest, AnalysisResponse, IngredientInfo
 from app.services.ocr_service import ocr_service
 from app.services.ai_service import ai_service
+from app.services.profiling_service import stage
 
 router = APIRouter()
 
@@ -45,7 +46,8 @@ async def analyze_product(
             )
         
         # Step 2: Parse ingredients from extracted text
-        ingredients_list = ocr_service.preprocess_ingredient_text(extracted_text)
+        with stage("parse"):
+            ingredients_list = ocr_service.preprocess_ingredient_text(extracted_text)
         
         if not ingredients_list:
             raise HTTPException(
@@ -68,10 +70,11 @@ async def analyze_product(
                 }
         
         # Step 4: AI Analysis
-        analysis_result = await ai_service.analyze_ingredients(
-            ingredients_list,
-            user_prefs
-        )
+        with stage("ai"):
+            analysis_result = await ai_service.analyze_ingredients(
+                ingredients_list,
+                user_prefs
+            )
         
         # Step 5: Store analysis in database
         analysis_record = AnalysisHistory(
@@ -87,9 +90,10 @@ async def analyze_product(
             confidence_score=min(ocr_confidence, analysis_result["confidence_score"])
         )
         
-        db.add(analysis_record)
-        db.commit()
-        db.refresh(analysis_record)
+        with stage("db_commit"):
+            db.add(analysis_record)
+            db.commit()
+            db.refresh(analysis_record)
         
         # Step 6: Return response
         return AnalysisResponse(
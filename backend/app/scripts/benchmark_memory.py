@@ -0,0 +1,85 @@
+"""
+Report memory use of a running gunicorn master and its workers (Linux only)
+
+Usage:
+    gunicorn -c gunicorn.conf.py app.main:app --pid /tmp/dermacare.pid &
+    python -m app.scripts.benchmark_memory --pid-file /tmp/dermacare.pid
+
+RSS counts shared pages once per process and so overstates a preforked
+deployment. PSS splits each shared page between the processes mapping it,
+so the PSS total is what the deployment really costs, and the per-worker
+figure is the marginal cost of raising WORKERS by one.
+"""
+import argparse
+import os
+import sys
+from typing import Dict, List
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    task_dir = f"/proc/{pid}/task"
+    for tid in os.listdir(task_dir):
+        with open(os.path.join(task_dir, tid, "children")) as f:
+            children.extend(int(child) for child in f.read().split())
+    return children
+
+
+def read_memory(pid: int) -> Dict[str, int]:
+    """RSS, PSS, shared and private memory of a process in kB, from smaps_rollup"""
+    fields = {"Rss": 0, "Pss": 0, "Shared_Clean": 0, "Shared_Dirty": 0,
+              "Private_Clean": 0, "Private_Dirty": 0}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in fields:
+                fields[key] = int(value.split()[0])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "shared": fields["Shared_Clean"] + fields["Shared_Dirty"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def _mb(kb: int) -> str:
+    return f"{kb / 1024:8.1f}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Memory per gunicorn worker")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--pid", type=int, help="Gunicorn master pid")
+    group.add_argument("--pid-file", help="File containing the gunicorn master pid")
+    args = parser.parse_args(argv)
+
+    if args.pid_file:
+        with open(args.pid_file) as f:
+            master = int(f.read().strip())
+    else:
+        master = args.pid
+
+    workers = _children(master)
+    if not workers:
+        print(f"Process {master} has no workers", file=sys.stderr)
+        return 1
+
+    print(f"{'process':<16}{'RSS MB':>10}{'PSS MB':>10}{'shared MB':>11}{'private MB':>12}")
+    totals = {"rss": 0, "pss": 0}
+    worker_pss = []
+    for label, pid in [("master", master)] + [(f"worker {pid}", pid) for pid in workers]:
+        mem = read_memory(pid)
+        totals["rss"] += mem["rss"]
+        totals["pss"] += mem["pss"]
+        if pid != master:
+            worker_pss.append(mem["pss"])
+        print(f"{label:<16}{_mb(mem['rss']):>10}{_mb(mem['pss']):>10}"
+              f"{_mb(mem['shared']):>11}{_mb(mem['private']):>12}")
+
+    print(f"{'total':<16}{_mb(totals['rss']):>10}{_mb(totals['pss']):>10}")
+    print(f"\n{len(workers)} workers, {_mb(sum(worker_pss) // len(worker_pss)).strip()} MB PSS per worker")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+"""
+Bulk-load an ingredient dataset into the ingredients table
+
+Usage:
+    python -m app.scripts.import_ingredients data/ingredients.csv
+    python -m app.scripts.import_ingredients data/ingredients.jsonl --batch-size 10000
+    python -m app.scripts.import_ingredients --export-only
+
+Rows are upserted on `name`; `common_names` are merged with what is already
+stored. After loading, a memory-mappable vocabulary snapshot is written to
+INGREDIENT_VOCAB_PATH for the API workers to map at startup.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import sqlite
+
+from app.config import settings
+from app.database import engine, init_db
+from app.models.models import Ingredient
+from app.services.ingredient_vocab import (
+    build_lookup_keys,
+    normalize_ingredient_name,
+    write_vocab_snapshot,
+)
+
+JSON_FIELDS = ("common_names", "health_effects")
+TEXT_FIELDS = ("category", "description", "safety_rating")
+COLUMNS = ("name", "common_names", "lookup_keys", "category", "description",
+           "safety_rating", "health_effects", "allergen")
+
+
+def _parse_list(value: Any) -> List[str]:
+    """
+    Accept a JSON list, a ';'-separated string or nothing
+
+    Text that only looks like JSON, e.g. "[E307] Tocopherol", is split on ';'.
+    """
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    value = str(value).strip()
+    if value.startswith("["):
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, list):
+            return _parse_list(parsed)
+    return [v.strip() for v in value.split(";") if v.strip()]
+
+
+def _parse_bool(value: Any) -> Optional[bool]:
+    """None when the field is missing so the stored value is kept"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def _clean_record(raw: Any) -> Dict[str, Any]:
+    if not isinstance(raw, dict):
+        raise ValueError(f"expected an object, got {type(raw).__name__}")
+    record = {"name": str(raw.get("name") or "").strip()}
+    for field in JSON_FIELDS:
+        record[field] = _parse_list(raw.get(field))
+    for field in TEXT_FIELDS:
+        value = raw.get(field)
+        record[field] = (str(value).strip() or None) if value is not None else None
+    record["allergen"] = _parse_bool(raw.get("allergen"))
+    return record
+
+
+def _jsonl_rows(f) -> Iterator[Tuple[int, Any]]:
+    for line_number, line in enumerate(f, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def read_records(
+    path: str,
+    fmt: str,
+    skipped: Optional[List[Tuple[int, str]]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield cleaned records from a CSV or JSONL file
+
+    Malformed records are skipped rather than aborting the import; each is
+    reported on stderr and appended to `skipped` as (line number, reason).
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            rows = ((reader.line_num, raw) for raw in reader)
+        else:
+            rows = _jsonl_rows(f)
+
+        for line_number, raw in rows:
+            try:
+                if fmt != "csv":
+                    raw = json.loads(raw)
+                record = _clean_record(raw)
+            except (ValueError, TypeError) as e:
+                print(f"Skipping {path}:{line_number}: {e}", file=sys.stderr)
+                if skipped is not None:
+                    skipped.append((line_number, str(e)))
+                continue
+            if record["name"]:
+                yield record
+
+
+def _merge_names(*groups: List[str]) -> List[str]:
+    """Union of common names, keeping first-seen order and dropping case duplicates"""
+    merged, seen = [], set()
+    for group in groups:
+        for name in group or []:
+            if name.lower() not in seen:
+                seen.add(name.lower())
+                merged.append(name)
+    return merged
+
+
+def _dedupe(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse repeated names within a batch, later rows override earlier ones"""
+    by_name: Dict[str, Dict[str, Any]] = {}
+    for record in batch:
+        previous = by_name.get(record["name"])
+        if previous:
+            record["common_names"] = _merge_names(previous["common_names"], record["common_names"])
+            record["health_effects"] = record["health_effects"] or previous["health_effects"]
+            for field in TEXT_FIELDS + ("allergen",):
+                if record[field] is None:
+                    record[field] = previous[field]
+        by_name[record["name"]] = record
+    return list(by_name.values())
+
+
+def _merge_existing(conn, batch: List[Dict[str, Any]]):
+    """
+    Fold already-stored values into the batch and build lookup keys
+
+    common_names are unioned; any other field missing from the input keeps
+    its stored value, so partial datasets can be layered on top of each other.
+    """
+    table = Ingredient.__table__
+    names = [record["name"] for record in batch]
+    existing = {
+        row.name: row
+        for row in conn.execute(select(table).where(table.c.name.in_(names)))
+    }
+
+    for record in batch:
+        stored = existing.get(record["name"])
+        if stored is not None:
+            record["common_names"] = _merge_names(stored.common_names, record["common_names"])
+            record["health_effects"] = record["health_effects"] or stored.health_effects or []
+            for field in TEXT_FIELDS + ("allergen",):
+                if record[field] is None:
+                    record[field] = getattr(stored, field)
+        if record["allergen"] is None:
+            record["allergen"] = False
+        record["lookup_keys"] = build_lookup_keys(record["name"], record["common_names"])
+
+
+def _upsert_sqlite(conn, batch: List[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT executed once per batch via executemany"""
+    stmt = sqlite.insert(Ingredient.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={
+            "common_names": stmt.excluded.common_names,
+            "lookup_keys": stmt.excluded.lookup_keys,
+            "category": stmt.excluded.category,
+            "description": stmt.excluded.description,
+            "safety_rating": stmt.excluded.safety_rating,
+            "health_effects": stmt.excluded.health_effects,
+            "allergen": stmt.excluded.allergen,
+            "updated_at": func.now(),
+        },
+    )
+    conn.execute(stmt, [{column: record[column] for column in COLUMNS} for record in batch])
+
+
+_PG_STAGING = """
+CREATE TEMP TABLE IF NOT EXISTS ingredients_staging (
+    name VARCHAR(255),
+    common_names JSON,
+    lookup_keys JSON,
+    category VARCHAR(100),
+    description TEXT,
+    safety_rating VARCHAR(50),
+    health_effects JSON,
+    allergen BOOLEAN
+) ON COMMIT DELETE ROWS
+"""
+
+_PG_UPSERT = """
+INSERT INTO ingredients (name, common_names, lookup_keys, category, description,
+                         safety_rating, health_effects, allergen)
+SELECT name, common_names, lookup_keys, category, description,
+       safety_rating, health_effects, allergen
+FROM ingredients_staging
+ON CONFLICT (name) DO UPDATE SET
+    common_names = EXCLUDED.common_names,
+    lookup_keys = EXCLUDED.lookup_keys,
+    category = EXCLUDED.category,
+    description = EXCLUDED.description,
+    safety_rating = EXCLUDED.safety_rating,
+    health_effects = EXCLUDED.health_effects,
+    allergen = EXCLUDED.allergen,
+    updated_at = now()
+"""
+
+
+def _copy_field(column: str, value: Any) -> str:
+    """
+    Format one value for COPY ... (FORMAT csv)
+
+    In CSV COPY an unquoted empty field is NULL and a quoted one is an empty
+    string, so None is left bare and every other value is quoted.
+    """
+    if value is None:
+        return ""
+    if column in JSON_FIELDS or column == "lookup_keys":
+        value = json.dumps(value)
+    elif isinstance(value, bool):
+        value = "true" if value else "false"
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_buffer(batch: List[Dict[str, Any]]) -> io.StringIO:
+    """Serialize a batch as CSV input for COPY, in COLUMNS order"""
+    buffer = io.StringIO()
+    for record in batch:
+        buffer.write(",".join(_copy_field(column, record[column]) for column in COLUMNS))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def _upsert_postgres(conn, batch: List[Dict[str, Any]]):
+    """COPY the batch into a temp staging table, then upsert in one statement"""
+    buffer = _copy_buffer(batch)
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(_PG_STAGING)
+        cursor.copy_expert(
+            f"COPY ingredients_staging ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        cursor.execute(_PG_UPSERT)
+    finally:
+        cursor.close()
+
+
+def load_batch(batch: List[Dict[str, Any]]) -> int:
+    """Upsert one batch in its own transaction, returns rows written"""
+    batch = _dedupe(batch)
+    with engine.begin() as conn:
+        _merge_existing(conn, batch)
+        if engine.dialect.name == "postgresql":
+            _upsert_postgres(conn, batch)
+        else:
+            _upsert_sqlite(conn, batch)
+    return len(batch)
+
+
+def export_snapshot(path: str) -> int:
+    """
+    Write the vocabulary snapshot from the current ingredients table
+
+    Canonical names are emitted before common names, so a common name never
+    shadows another ingredient whose own name normalizes to the same key.
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(Ingredient.id, Ingredient.name, Ingredient.lookup_keys).order_by(Ingredient.id)
+        ).all()
+
+    canonical, aliases = [], []
+    for ingredient_id, name, lookup_keys in rows:
+        keys = lookup_keys or build_lookup_keys(name, [])
+        canonical.append((normalize_ingredient_name(name), ingredient_id))
+        aliases.extend((key, ingredient_id) for key in keys)
+    return write_vocab_snapshot(canonical + aliases, path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-load ingredients from CSV or JSONL")
+    parser.add_argument("path", nargs="?", help="CSV or JSONL file to import")
+    parser.add_argument("--format", choices=["csv", "jsonl"],
+                        help="Input format (default: inferred from extension)")
+    parser.add_argument("--batch-size", type=int, default=settings.INGREDIENT_IMPORT_BATCH_SIZE)
+    parser.add_argument("--snapshot", default=settings.INGREDIENT_VOCAB_PATH,
+                        help="Where to write the vocabulary snapshot")
+    parser.add_argument("--no-snapshot", action="store_true", help="Skip the snapshot export")
+    parser.add_argument("--export-only", action="store_true",
+                        help="Only export the snapshot from the existing table")
+    args = parser.parse_args(argv)
+
+    if not args.path and not args.export_only:
+        parser.error("path is required unless --export-only is given")
+
+    init_db()
+
+    if not args.export_only:
+        fmt = args.format or ("jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv")
+        total, batch, skipped = 0, [], []
+        for record in read_records(args.path, fmt, skipped):
+            batch.append(record)
+            if len(batch) >= args.batch_size:
+                total += load_batch(batch)
+                batch = []
+                print(f"Imported {total} ingredients...")
+        if batch:
+            total += load_batch(batch)
+        print(f"Imported {total} ingredients from {args.path}")
+        if skipped:
+            print(f"Skipped {len(skipped)} malformed records", file=sys.stderr)
+
+    if not args.no_snapshot:
+        count = export_snapshot(args.snapshot)
+        print(f"Wrote {count} lookup keys to {args.snapshot}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
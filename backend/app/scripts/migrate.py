@@ -0,0 +1,23 @@
+"""
+Create missing tables and apply pending migrations
+
+Usage:
+    python -m app.scripts.migrate
+
+Run once per deployment before starting the API. Workers do not touch the
+schema unless AUTO_MIGRATE is set, so several of them starting at once
+cannot race on DDL.
+"""
+import sys
+
+from app.database import init_db
+
+
+def main() -> int:
+    init_db()
+    print("Database schema is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
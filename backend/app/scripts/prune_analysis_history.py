@@ -0,0 +1,162 @@
+"""
+Archive and delete old analysis_history rows in small batches
+
+Usage:
+    python -m app.scripts.prune_analysis_history
+    python -m app.scripts.prune_analysis_history --days 30 --batch-size 500
+    python -m app.scripts.prune_analysis_history --no-archive --dry-run
+
+Rows older than ANALYSIS_RETENTION_DAYS are removed oldest-first, one short
+transaction per batch, so the job never holds long locks or builds up a huge
+dead-tuple backlog for vacuum. Unless archiving is disabled, each batch is
+first appended to a gzip-compressed JSONL file in ANALYSIS_ARCHIVE_DIR.
+Meant to be run periodically, e.g. from cron.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+
+from app.config import settings
+from app.database import engine, init_db
+from app.models.models import AnalysisHistory
+
+
+def _serialize(row) -> Dict[str, Any]:
+    record = dict(row._mapping)
+    if record.get("created_at") is not None:
+        record["created_at"] = record["created_at"].isoformat()
+    return record
+
+
+def archive_path(archive_dir: str, run_date: Optional[datetime] = None) -> str:
+    """One archive file per run day, e.g. analysis_history-20260101.jsonl.gz"""
+    run_date = run_date or datetime.now(timezone.utc)
+    return os.path.join(archive_dir, f"analysis_history-{run_date:%Y%m%d}.jsonl.gz")
+
+
+def _append_archive(path: str, rows: List[Dict[str, Any]]):
+    """
+    Append a batch as a new gzip member
+
+    Concatenated gzip members form a valid gzip file, so each batch can be
+    flushed to disk before its rows are deleted.
+    """
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str).encode("utf-8") + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def prune_analysis_history(
+    days: int = settings.ANALYSIS_RETENTION_DAYS,
+    batch_size: int = settings.ANALYSIS_RETENTION_BATCH_SIZE,
+    archive: bool = settings.ANALYSIS_RETENTION_ARCHIVE,
+    archive_dir: str = settings.ANALYSIS_ARCHIVE_DIR,
+    pause: float = settings.ANALYSIS_RETENTION_PAUSE_SECONDS,
+    max_batches: Optional[int] = None,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    Remove analysis_history rows older than the retention window
+
+    Args:
+        days: Rows with created_at older than this many days are pruned
+        batch_size: Rows archived and deleted per transaction
+        archive: Write rows to a compressed archive before deleting them
+        archive_dir: Directory for archive files
+        pause: Seconds to sleep between batches
+        max_batches: Stop after this many batches (None = until done)
+        dry_run: Only count the rows that would be pruned
+
+    Returns:
+        dict with cutoff, rows pruned, batches run and archive file
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    table = AnalysisHistory.__table__
+
+    if dry_run:
+        with engine.connect() as conn:
+            count = conn.execute(
+                select(func.count()).select_from(table).where(table.c.created_at < cutoff)
+            ).scalar()
+        return {"cutoff": cutoff.isoformat(), "pruned": 0, "eligible": count,
+                "batches": 0, "archive": None}
+
+    path = None
+    if archive:
+        os.makedirs(archive_dir, exist_ok=True)
+        path = archive_path(archive_dir)
+
+    # Filtering and ordering on created_at lets the created_at index serve
+    # both the range scan and the sort; id only breaks ties
+    query = select(table if archive else table.c.id).where(
+        table.c.created_at < cutoff
+    ).order_by(table.c.created_at, table.c.id).limit(batch_size)
+
+    pruned, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        with engine.begin() as conn:
+            rows = conn.execute(query).all()
+            if not rows:
+                break
+            if archive:
+                _append_archive(path, [_serialize(row) for row in rows])
+            ids = [row.id for row in rows]
+            conn.execute(delete(table).where(table.c.id.in_(ids)))
+
+        pruned += len(rows)
+        batches += 1
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    return {"cutoff": cutoff.isoformat(), "pruned": pruned, "batches": batches, "archive": path}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Archive and delete old analysis history")
+    parser.add_argument("--days", type=int, default=settings.ANALYSIS_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.ANALYSIS_RETENTION_BATCH_SIZE)
+    parser.add_argument("--archive-dir", default=settings.ANALYSIS_ARCHIVE_DIR)
+    parser.add_argument("--no-archive", action="store_true", help="Delete without archiving")
+    parser.add_argument("--pause", type=float, default=settings.ANALYSIS_RETENTION_PAUSE_SECONDS,
+                        help="Seconds to sleep between batches")
+    parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+    parser.add_argument("--dry-run", action="store_true", help="Only count eligible rows")
+    args = parser.parse_args(argv)
+
+    init_db()
+
+    result = prune_analysis_history(
+        days=args.days,
+        batch_size=args.batch_size,
+        archive=settings.ANALYSIS_RETENTION_ARCHIVE and not args.no_archive,
+        archive_dir=args.archive_dir,
+        pause=args.pause,
+        max_batches=args.max_batches,
+        dry_run=args.dry_run,
+    )
+
+    if args.dry_run:
+        print(f"{result['eligible']} rows older than {result['cutoff']} would be pruned")
+    else:
+        print(f"Pruned {result['pruned']} rows older than {result['cutoff']} "
+              f"in {result['batches']} batches")
+        if result["archive"]:
+            print(f"Archived to {result['archive']}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
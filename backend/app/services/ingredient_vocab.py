@@ -0,0 +1,182 @@
+import mmap
+import os
+import re
+import struct
+import unicodedata
+from typing import Iterable, List, Optional, Tuple
+from app.config import settings
+
+
+# Snapshot layout (little-endian):
+#   header:  magic (8s) | entry count (I) | key blob size (I)
+#   index:   count x (key offset (I), key length (I), ingredient id (i)), sorted by key
+#   blob:    UTF-8 encoded keys, concatenated
+SNAPSHOT_MAGIC = b"DCVOCAB1"
+_HEADER = struct.Struct("<8sII")
+_ENTRY = struct.Struct("<IIi")
+
+_NON_WORD = re.compile(r"[^\w\s-]")
+_WHITESPACE = re.compile(r"[\s_-]+")
+
+
+def normalize_ingredient_name(name: str) -> str:
+    """
+    Build the lookup key for an ingredient name
+
+    Strips accents and punctuation, lowercases and collapses whitespace so
+    that "Sodium  Laureth-Sulfate" and "sodium laureth sulfate" match.
+    """
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _NON_WORD.sub(" ", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def build_lookup_keys(name: str, common_names: Iterable[str]) -> List[str]:
+    """Return the unique normalized keys for a name and its common names"""
+    keys = []
+    for candidate in [name, *common_names]:
+        key = normalize_ingredient_name(candidate or "")
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def write_vocab_snapshot(entries: Iterable[Tuple[str, int]], path: str) -> int:
+    """
+    Write (lookup key, ingredient id) pairs to a memory-mappable snapshot
+
+    When several ingredients share a key the first entry wins, so callers
+    should list every canonical name before any common name.
+
+    Args:
+        entries: Normalized keys with the id of the ingredient they resolve to
+        path: Destination file, replaced atomically
+
+    Returns:
+        Number of keys written
+    """
+    by_key = {}
+    for key, ingredient_id in entries:
+        by_key.setdefault(key, ingredient_id)
+
+    index = []
+    blob = bytearray()
+    for key in sorted(by_key):
+        encoded = key.encode("utf-8")
+        index.append(_ENTRY.pack(len(blob), len(encoded), by_key[key]))
+        blob.extend(encoded)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, len(index), len(blob)))
+        f.write(b"".join(index))
+        f.write(blob)
+    os.replace(tmp_path, path)
+
+    return len(index)
+
+
+class IngredientVocabulary:
+    def __init__(self, path: Optional[str] = None):
+        """
+        Read-only view over an ingredient vocabulary snapshot
+
+        The file is mmapped rather than read, so loading is O(1) and the
+        pages are shared between every worker process on the host.
+        """
+        self.path = path or settings.INGREDIENT_VOCAB_PATH
+        self._file = None
+        self._mmap = None
+        self._count = 0
+        self._blob_start = 0
+
+    def load(self) -> bool:
+        """
+        Map the snapshot into memory
+
+        Returns False if the file is missing or not a complete snapshot, so
+        a bad export degrades to "no vocabulary" instead of failing startup.
+        """
+        if self._mmap is not None:
+            return True
+        if not os.path.exists(self.path):
+            return False
+
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            print(f"Ingredient vocabulary {self.path} is truncated, ignoring it")
+            return False
+
+        magic, count, blob_size = _HEADER.unpack(header)
+        if magic != SNAPSHOT_MAGIC:
+            print(f"{self.path} is not an ingredient vocabulary snapshot, ignoring it")
+            return False
+        if size != _HEADER.size + count * _ENTRY.size + blob_size:
+            print(f"Ingredient vocabulary {self.path} is truncated, ignoring it")
+            return False
+
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = count
+        self._blob_start = _HEADER.size + count * _ENTRY.size
+        return True
+
+    def close(self):
+        """Release the mapping"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, position: int) -> Tuple[bytes, int]:
+        offset, length, ingredient_id = _ENTRY.unpack_from(
+            self._mmap, _HEADER.size + position * _ENTRY.size
+        )
+        start = self._blob_start + offset
+        return self._mmap[start:start + length], ingredient_id
+
+    def lookup(self, name: str) -> Optional[int]:
+        """
+        Resolve an ingredient name to its id
+
+        Args:
+            name: Raw ingredient name, e.g. as parsed from OCR text
+
+        Returns:
+            Ingredient id, or None if unknown or no snapshot is loaded
+        """
+        if self._mmap is None and not self.load():
+            return None
+
+        target = normalize_ingredient_name(name).encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key, ingredient_id = self._entry(mid)
+            if key == target:
+                return ingredient_id
+            if key < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def __contains__(self, name: str) -> bool:
+        return self.lookup(name) is not None
+
+
+# Singleton instance
+ingredient_vocab = IngredientVocabulary()
@@ -4,6 +4,7 @@ from PIL import Image
 import io
 from typing import List, Optional
 from app.config import settings
+from app.services.profiling_service import stage
 
 
 class OCRService:
@@ -19,6 +20,10 @@ class OCRService:
             self.reader = easyocr.Reader(self.languages, gpu=False)
         return self.reader
     
+    def warm_up(self):
+        """Load the OCR models up front instead of on the first request"""
+        self._get_reader()
+    
     async def extract_text_from_image(self, image_bytes: bytes) -> dict:
         """
         Extract text from image using EasyOCR
@@ -30,19 +35,21 @@ class OCRService:
             dict with extracted_text and confidence score
         """
         try:
-            # Convert bytes to PIL Image
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Convert to numpy array for EasyOCR
-            image_array = np.array(image)
+            with stage("image_decode"):
+                # Convert bytes to PIL Image
+                image = Image.open(io.BytesIO(image_bytes))
+                
+                # Convert to RGB if necessary
+                if image.mode != 'RGB':
+                    image = image.convert('RGB')
+                
+                # Convert to numpy array for EasyOCR
+                image_array = np.array(image)
             
             # Perform OCR
             reader = self._get_reader()
-            results = reader.readtext(image_array)
+            with stage("ocr"):
+                results = reader.readtext(image_array)
             
             # Extract text and confidence scores
             extracted_texts = []
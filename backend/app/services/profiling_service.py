@@ -0,0 +1,307 @@
+import glob
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from fastapi import Request
+from app.config import settings
+
+
+_CAPTURE_ID = re.compile(r"^[0-9a-f]{32}$")
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Stage timings of the request currently being handled, None when not tracked
+_stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a named stage of the current request
+
+    A no-op unless the profiling middleware is tracking the request, so it
+    is safe to leave around hot-path code.
+    """
+    timings = _stage_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+class StackSampler:
+    # Samples are counted per bucket of this many seconds; a capture takes
+    # every bucket overlapping the request, so it is accurate to one bucket
+    BUCKET_SECONDS = 0.05
+    # Bound on distinct stacks remembered by the fold cache
+    MAX_CACHED_STACKS = 10000
+
+    def __init__(self, interval_ms: float, buffer_seconds: float, all_threads: bool = False):
+        """
+        Background thread that periodically records stacks
+
+        By default only the thread that calls start() is sampled, which is
+        the event loop when started from an app startup hook; all_threads
+        also samples threadpool workers. Samples are counted per time bucket
+        in a ring buffer covering the last `buffer_seconds`, so a request can
+        be profiled after the fact once it turns out slow.
+        """
+        self.interval = interval_ms / 1000
+        self.all_threads = all_threads
+        self.buckets = deque(maxlen=max(1, int(buffer_seconds / self.BUCKET_SECONDS)))
+        self._lock = threading.Lock()
+        self._folded: Dict[tuple, str] = {}
+        self._labels: Dict[object, str] = {}
+        self._target = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if not self.all_threads:
+                frame = frames.get(self._target)
+                frames = {self._target: frame} if frame is not None else {}
+
+            stacks = [
+                self._fold(thread_id, frame)
+                for thread_id, frame in frames.items()
+                if thread_id != own_id
+            ]
+            self._record(time.perf_counter(), stacks)
+
+    def _record(self, timestamp: float, stacks: List[str]):
+        bucket = int(timestamp / self.BUCKET_SECONDS)
+        with self._lock:
+            if not self.buckets or self.buckets[-1][0] != bucket:
+                self.buckets.append((bucket, Counter()))
+            self.buckets[-1][1].update(stacks)
+
+    def _fold(self, thread_id: int, frame) -> str:
+        """
+        Collapse a stack into `thread;outer;...;inner` (flamegraph folded format)
+
+        Only the tuple of code objects is built per sample; the string for a
+        given stack is formatted once and then reused from the cache.
+        """
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        key = (thread_id, *codes)
+
+        folded = self._folded.get(key)
+        if folded is None:
+            if len(self._folded) >= self.MAX_CACHED_STACKS:
+                self._folded.clear()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            parts = [names.get(thread_id, str(thread_id))]
+            parts.extend(self._label(code) for code in reversed(codes))
+            folded = self._folded[key] = ";".join(parts)
+        return folded
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def collect(self, start: float, end: float) -> Counter:
+        """Aggregate the samples in every bucket overlapping two perf_counter timestamps"""
+        first = int(start / self.BUCKET_SECONDS)
+        last = int(end / self.BUCKET_SECONDS)
+        counts = Counter()
+        with self._lock:
+            for bucket, stacks in self.buckets:
+                if first <= bucket <= last:
+                    counts.update(stacks)
+        return counts
+
+
+class ProfilingService:
+    def __init__(self):
+        """Opt-in request profiler, configured from settings"""
+        self.enabled = settings.PROFILING_ENABLED
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.slow_request_ms = settings.PROFILING_SLOW_REQUEST_MS
+        self.output_dir = settings.PROFILING_OUTPUT_DIR
+        self.max_captures = settings.PROFILING_MAX_CAPTURES
+        self.sampler = StackSampler(
+            settings.PROFILING_INTERVAL_MS,
+            settings.PROFILING_BUFFER_SECONDS,
+            settings.PROFILING_ALL_THREADS
+        )
+
+    def start(self):
+        if self.enabled:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.sampler.start()
+
+    def stop(self):
+        self.sampler.stop()
+
+    def begin_request(self) -> Dict[str, float]:
+        """Start tracking stage timings for the current request"""
+        timings: Dict[str, float] = {}
+        _stage_timings.set(timings)
+        return timings
+
+    def should_capture(self, duration_ms: float) -> Optional[str]:
+        """Return why a finished request should be captured, or None"""
+        if self.slow_request_ms and duration_ms >= self.slow_request_ms:
+            return "slow"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def capture(
+        self,
+        request_id: str,
+        method: str,
+        path: str,
+        status_code: int,
+        start: float,
+        end: float,
+        stages: Dict[str, float],
+        reason: str
+    ) -> dict:
+        """
+        Save the profile of a finished request
+
+        Files are named by a server-generated capture id, never by the
+        client's request id, so callers cannot overwrite each other's
+        captures. Writes `<capture_id>.folded` (input for flamegraph.pl or
+        speedscope) and `<capture_id>.json` with the request metadata and
+        stage timings.
+        """
+        stacks = self.sampler.collect(start, end)
+        capture_id = uuid.uuid4().hex
+        capture = {
+            "capture_id": capture_id,
+            "request_id": request_id,
+            "method": method,
+            "path": path,
+            "status_code": status_code,
+            "reason": reason,
+            "duration_ms": round((end - start) * 1000, 2),
+            "stages_ms": {name: round(ms, 2) for name, ms in stages.items()},
+            "samples": sum(stacks.values()),
+            "captured_at": time.time(),
+        }
+
+        base = os.path.join(self.output_dir, capture_id)
+        with open(f"{base}.folded", "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        # The .json file is what marks a capture as complete, write it last
+        with open(f"{base}.json.tmp", "w") as f:
+            json.dump(capture, f, indent=2)
+        os.replace(f"{base}.json.tmp", f"{base}.json")
+
+        self._prune()
+        return capture
+
+    def _capture_paths(self) -> List[str]:
+        """Capture .json files in the output directory, newest first"""
+        paths = []
+        for path in glob.glob(os.path.join(self.output_dir, "*.json")):
+            try:
+                paths.append((os.path.getmtime(path), path))
+            except OSError:
+                continue  # Pruned by another worker in the meantime
+        return [path for _, path in sorted(paths, reverse=True)]
+
+    def _prune(self):
+        """Delete all but the newest `max_captures` captures from disk"""
+        for path in self._capture_paths()[self.max_captures:]:
+            for stale in (path, f"{path[:-len('.json')]}.folded"):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+
+    def recent_captures(self) -> List[dict]:
+        """
+        Most recent captures first, read from the output directory
+
+        Covers captures from every worker process and survives restarts.
+        """
+        captures = []
+        for path in self._capture_paths()[:self.max_captures]:
+            try:
+                with open(path) as f:
+                    captures.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return captures
+
+    def read_folded(self, capture_id: str) -> Optional[str]:
+        """Folded stacks of a capture, or None if it does not exist"""
+        if not _CAPTURE_ID.match(capture_id):
+            return None
+        path = os.path.join(self.output_dir, f"{capture_id}.folded")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read()
+
+
+# Singleton instance
+profiling_service = ProfilingService()
+
+
+async def profiling_middleware(request: Request, call_next):
+    """HTTP middleware capturing a profile for sampled or slow requests"""
+    request_id = request.headers.get("X-Request-ID", "")
+    if not _REQUEST_ID.match(request_id):
+        request_id = uuid.uuid4().hex
+
+    stages = profiling_service.begin_request()
+    start = time.perf_counter()
+    response = await call_next(request)
+    end = time.perf_counter()
+
+    reason = profiling_service.should_capture((end - start) * 1000)
+    if reason:
+        capture = profiling_service.capture(
+            request_id,
+            request.method,
+            request.url.path,
+            response.status_code,
+            start,
+            end,
+            stages,
+            reason
+        )
+        response.headers["X-Profile-ID"] = capture["capture_id"]
+    response.headers["X-Request-ID"] = request_id
+    return response
@@ -0,0 +1,64 @@
+"""
+Production server: gunicorn master with preforked uvicorn workers
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The master runs schema migration once, loads the app and the EasyOCR models,
+then forks WORKERS processes. Workers share the model weights copy-on-write
+instead of each loading their own copy.
+"""
+import gc
+import os
+
+# Tables are created once in the master below, not by every worker on
+# startup. Set before app.config is imported so Settings picks it up.
+os.environ["AUTO_MIGRATE"] = "False"
+
+from app.config import settings  # noqa: E402
+
+# Split the cores between workers so N workers don't oversubscribe the CPUs;
+# a single worker keeps all of them, as plain uvicorn did
+worker_threads = settings.WORKER_THREADS or max(1, (os.cpu_count() or 1) // settings.WORKERS)
+
+# Thread caps must be in the environment before torch is imported
+for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ.setdefault(var, str(worker_threads))
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = settings.WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = settings.WORKER_TIMEOUT
+preload_app = True
+
+
+def on_starting(server):
+    """Runs once in the master, before any worker is forked"""
+    from app.database import init_db
+
+    init_db()
+
+
+def when_ready(server):
+    """Load the models in the master right before the workers fork"""
+    from app.database import engine
+
+    if settings.PRELOAD_OCR_MODELS:
+        from app.services.ocr_service import ocr_service
+
+        ocr_service.warm_up()
+
+    # Connections opened in the master must not be shared with workers
+    engine.dispose()
+
+    # Move everything loaded so far out of the GC's reach, so collections in
+    # the workers don't write to (and un-share) the inherited pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Per-worker setup after fork"""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(worker_threads)
@@ -0,0 +1,31 @@
+"""Add ingredients.lookup_keys
+
+Tables are created by Base.metadata.create_all, which never alters an
+existing table, so databases created before the column existed need it
+added here. Skipped when create_all already made the column.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if "lookup_keys" not in _columns("ingredients"):
+        op.add_column("ingredients", sa.Column("lookup_keys", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("ingredients", "lookup_keys")
@@ -0,0 +1,33 @@
+"""Index analysis_history.created_at
+
+The retention job scans analysis_history by created_at. create_all never
+adds indexes to an existing table, so databases created before the index
+existed get it here. Skipped when create_all already made it.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_analysis_history_created_at"
+
+
+def _indexes(table):
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    if INDEX_NAME not in _indexes("analysis_history"):
+        op.create_index(INDEX_NAME, "analysis_history", ["created_at"])
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name="analysis_history")
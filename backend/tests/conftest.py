@@ -0,0 +1,26 @@
+import os
+import tempfile
+
+import pytest
+
+# Point the app at a throwaway SQLite database before app.config is imported
+_tmp_dir = tempfile.mkdtemp(prefix="dermacare-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}"
+os.environ["INGREDIENT_VOCAB_PATH"] = os.path.join(_tmp_dir, "ingredient_vocab.bin")
+
+from app.database import engine, init_db, Base  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
+    yield engine
+
+
+@pytest.fixture
+def clean_tables(database):
+    """Empty every table before the test"""
+    with database.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    yield database
@@ -0,0 +1,164 @@
+import csv
+import json
+
+from sqlalchemy import select
+
+from app.models.models import Ingredient
+from app.scripts.import_ingredients import (
+    COLUMNS,
+    _copy_buffer,
+    _dedupe,
+    _parse_list,
+    export_snapshot,
+    load_batch,
+    read_records,
+)
+from app.services.ingredient_vocab import IngredientVocabulary
+
+
+def _record(name, common_names=(), category=None, allergen=None, health_effects=()):
+    return {
+        "name": name,
+        "common_names": list(common_names),
+        "category": category,
+        "description": None,
+        "safety_rating": None,
+        "health_effects": list(health_effects),
+        "allergen": allergen,
+    }
+
+
+def _stored(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(select(Ingredient.__table__).where(Ingredient.name == name)).one()
+
+
+def test_dedupe_merges_repeated_names():
+    batch = _dedupe([
+        _record("Peanut Oil", ["Arachis oil"], category="oil", allergen=True),
+        _record("Salt"),
+        _record("Peanut Oil", ["arachis OIL", "Groundnut oil"]),
+    ])
+
+    assert [record["name"] for record in batch] == ["Peanut Oil", "Salt"]
+    peanut = batch[0]
+    assert peanut["common_names"] == ["Arachis oil", "Groundnut oil"]
+    assert peanut["category"] == "oil"
+    assert peanut["allergen"] is True
+
+
+def test_upsert_merges_with_stored_values(clean_tables):
+    load_batch([_record("Peanut Oil", ["Arachis oil"], category="oil", allergen=True,
+                        health_effects=["allergic reaction"])])
+    load_batch([_record("Peanut Oil", ["Groundnut oil"])])
+
+    stored = _stored(clean_tables, "Peanut Oil")
+    assert stored.common_names == ["Arachis oil", "Groundnut oil"]
+    assert stored.category == "oil"
+    assert stored.allergen is True
+    assert stored.health_effects == ["allergic reaction"]
+    assert stored.lookup_keys == ["peanut oil", "arachis oil", "groundnut oil"]
+
+
+def test_upsert_overrides_provided_fields(clean_tables):
+    load_batch([_record("Salt", category="mineral", allergen=True)])
+    load_batch([_record("Salt", category="seasoning", allergen=False)])
+
+    stored = _stored(clean_tables, "Salt")
+    assert stored.category == "seasoning"
+    assert stored.allergen is False
+
+
+def test_new_rows_default_allergen_to_false(clean_tables):
+    load_batch([_record("Sugar")])
+    assert _stored(clean_tables, "Sugar").allergen is False
+
+
+def test_read_records_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "ingredients.csv"
+    csv_path.write_text(
+        "name,common_names,category,allergen\n"
+        "Peanut Oil,Arachis oil;Groundnut oil,oil,yes\n"
+        ",skipped,,\n"
+    )
+    jsonl_path = tmp_path / "ingredients.jsonl"
+    jsonl_path.write_text('{"name": "Salt", "common_names": ["NaCl"]}\n\n')
+
+    (peanut,) = read_records(str(csv_path), "csv")
+    assert peanut["common_names"] == ["Arachis oil", "Groundnut oil"]
+    assert peanut["allergen"] is True
+
+    (salt,) = read_records(str(jsonl_path), "jsonl")
+    assert salt["common_names"] == ["NaCl"]
+    assert salt["allergen"] is None
+
+
+def test_parse_list_falls_back_to_semicolons():
+    assert _parse_list('["Aqua", "Water"]') == ["Aqua", "Water"]
+    assert _parse_list("[E307] Tocopherol; Vitamin E") == ["[E307] Tocopherol", "Vitamin E"]
+    assert _parse_list('["unterminated') == ['["unterminated']
+    assert _parse_list("[1, 2]") == ["1", "2"]
+
+
+def test_read_records_skips_malformed_lines(tmp_path):
+    csv_path = tmp_path / "ingredients.csv"
+    csv_path.write_text(
+        "name,common_names\n"
+        "Tocopherol,[E307] Vitamin E\n"
+        "Salt,NaCl\n"
+    )
+    skipped = []
+    records = list(read_records(str(csv_path), "csv", skipped))
+    assert [record["common_names"] for record in records] == [["[E307] Vitamin E"], ["NaCl"]]
+    assert skipped == []
+
+    jsonl_path = tmp_path / "ingredients.jsonl"
+    jsonl_path.write_text(
+        '{"name": "Salt"}\n'
+        '["not", "an", "object"]\n'
+        '\n'
+        '{"name": broken\n'
+        '{"name": "Sugar"}\n'
+    )
+    records = list(read_records(str(jsonl_path), "jsonl", skipped))
+    assert [record["name"] for record in records] == ["Salt", "Sugar"]
+    assert [line for line, _ in skipped] == [2, 4]
+
+
+def test_copy_buffer_for_postgres():
+    batch = [
+        dict(_record("Peanut Oil", ["Arachis \"oil\""], category="oil", allergen=True,
+                     health_effects=["rash"]),
+             description='Cold-pressed,\n"virgin" oil', lookup_keys=["peanut oil"]),
+        dict(_record("Salt", allergen=False), category="", lookup_keys=["salt"]),
+    ]
+    text = _copy_buffer(batch).getvalue()
+    lines = text.split("\n")
+
+    # None is an unquoted empty field (NULL); "" is quoted (empty string)
+    assert lines[-1] == ""
+    salt_line = [line for line in lines if line.startswith('"Salt"')][0]
+    assert salt_line.split(",")[COLUMNS.index("category")] == '""'
+    assert salt_line.split(",")[COLUMNS.index("description")] == ""
+
+    peanut, salt = [dict(zip(COLUMNS, row)) for row in csv.reader(text.splitlines(keepends=True))]
+    assert peanut["description"] == 'Cold-pressed,\n"virgin" oil'
+    assert json.loads(peanut["common_names"]) == ['Arachis "oil"']
+    assert json.loads(peanut["health_effects"]) == ["rash"]
+    assert json.loads(peanut["lookup_keys"]) == ["peanut oil"]
+    assert peanut["allergen"] == "true"
+    assert salt["allergen"] == "false"
+    assert json.loads(salt["common_names"]) == []
+
+
+def test_canonical_name_beats_older_common_name(clean_tables, tmp_path):
+    load_batch([_record("Aqua", ["Water"])])
+    load_batch([_record("Water")])
+
+    path = str(tmp_path / "vocab.bin")
+    export_snapshot(path)
+    vocab = IngredientVocabulary(path)
+
+    assert vocab.lookup("water") == _stored(clean_tables, "Water").id
+    assert vocab.lookup("aqua") == _stored(clean_tables, "Aqua").id
+    vocab.close()
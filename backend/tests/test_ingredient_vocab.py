@@ -0,0 +1,72 @@
+from app.services.ingredient_vocab import (
+    IngredientVocabulary,
+    build_lookup_keys,
+    normalize_ingredient_name,
+    write_vocab_snapshot,
+)
+
+
+def test_normalize_ingredient_name():
+    assert normalize_ingredient_name("Sodium  Laureth-Sulfate") == "sodium laureth sulfate"
+    assert normalize_ingredient_name("  Crème Fraîche ") == "creme fraiche"
+    assert normalize_ingredient_name("Vitamin E (Tocopherol).") == "vitamin e tocopherol"
+    assert normalize_ingredient_name("!!!") == ""
+
+
+def test_build_lookup_keys_dedupes_and_skips_empty():
+    keys = build_lookup_keys("Peanut Oil", ["peanut-oil", "Arachis Oil", "", "***"])
+    assert keys == ["peanut oil", "arachis oil"]
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "vocab.bin")
+    entries = [("water", 1), ("aqua", 1), ("sodium chloride", 2), ("salt", 2), ("crème", 3)]
+    assert write_vocab_snapshot(entries, path) == 5
+
+    vocab = IngredientVocabulary(path)
+    assert vocab.load()
+    assert len(vocab) == 5
+    assert vocab.lookup("Water") == 1
+    assert vocab.lookup("  SALT ") == 2
+    assert vocab.lookup("Sodium-Chloride") == 2
+    assert vocab.lookup("unknown") is None
+    assert "aqua" in vocab
+    vocab.close()
+
+
+def test_snapshot_first_entry_wins(tmp_path):
+    path = str(tmp_path / "vocab.bin")
+    write_vocab_snapshot([("water", 5), ("water", 3)], path)
+
+    vocab = IngredientVocabulary(path)
+    assert vocab.lookup("water") == 5
+    vocab.close()
+
+
+def test_empty_snapshot(tmp_path):
+    path = str(tmp_path / "vocab.bin")
+    assert write_vocab_snapshot([], path) == 0
+
+    vocab = IngredientVocabulary(path)
+    assert vocab.load()
+    assert vocab.lookup("water") is None
+    vocab.close()
+
+
+def test_missing_or_corrupt_snapshot_is_ignored(tmp_path):
+    assert not IngredientVocabulary(str(tmp_path / "missing.bin")).load()
+
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert not IngredientVocabulary(str(empty)).load()
+
+    bad_magic = tmp_path / "bad.bin"
+    bad_magic.write_bytes(b"NOTVOCAB" + b"\0" * 8)
+    assert not IngredientVocabulary(str(bad_magic)).load()
+
+    path = tmp_path / "vocab.bin"
+    write_vocab_snapshot([("water", 1), ("salt", 2)], str(path))
+    path.write_bytes(path.read_bytes()[:-3])
+    vocab = IngredientVocabulary(str(path))
+    assert not vocab.load()
+    assert vocab.lookup("water") is None
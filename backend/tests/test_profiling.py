@@ -0,0 +1,194 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.routes import admin
+from app.services import profiling_service as profiling_module
+from app.services.profiling_service import (
+    StackSampler,
+    profiling_middleware,
+    profiling_service,
+    stage,
+)
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling_service, "enabled", True)
+    monkeypatch.setattr(profiling_service, "output_dir", str(tmp_path))
+    monkeypatch.setattr(profiling_service, "max_captures", 2)
+    return profiling_service
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api/admin")
+    return TestClient(app)
+
+
+def _capture(profiler, request_id="req-1"):
+    stages = profiler.begin_request()
+    with stage("ocr"):
+        pass
+    now = time.perf_counter()
+    return profiler.capture(request_id, "POST", "/api/analysis/analyze", 200, now, now, stages, "slow")
+
+
+def test_capture_ids_are_server_generated(profiler):
+    first = _capture(profiler, "same-id")
+    second = _capture(profiler, "same-id")
+
+    assert first["capture_id"] != second["capture_id"]
+    assert first["request_id"] == "same-id"
+    assert "ocr" in first["stages_ms"]
+    assert profiler.read_folded(first["capture_id"]) is not None
+    assert profiler.read_folded("../same-id") is None
+
+
+def test_recent_captures_read_from_output_dir(profiler):
+    ids = []
+    for _ in range(3):
+        ids.append(_capture(profiler)["capture_id"])
+        time.sleep(0.01)
+
+    recent = [capture["capture_id"] for capture in profiler.recent_captures()]
+    assert recent == [ids[2], ids[1]]
+
+
+def test_old_captures_are_deleted(profiler, tmp_path):
+    ids = []
+    for _ in range(4):
+        ids.append(_capture(profiler)["capture_id"])
+        time.sleep(0.01)
+
+    kept = sorted(os.listdir(tmp_path))
+    assert kept == sorted(f"{capture_id}.{ext}" for capture_id in ids[2:] for ext in ("json", "folded"))
+    assert profiler.read_folded(ids[0]) is None
+
+
+def test_should_capture(profiler, monkeypatch):
+    monkeypatch.setattr(profiler, "slow_request_ms", 100)
+    monkeypatch.setattr(profiler, "sample_rate", 0.5)
+
+    assert profiler.should_capture(150) == "slow"
+    monkeypatch.setattr(profiling_module.random, "random", lambda: 0.4)
+    assert profiler.should_capture(10) == "sampled"
+    monkeypatch.setattr(profiling_module.random, "random", lambda: 0.6)
+    assert profiler.should_capture(10) is None
+
+    monkeypatch.setattr(profiler, "slow_request_ms", 0)
+    monkeypatch.setattr(profiler, "sample_rate", 0)
+    assert profiler.should_capture(10_000) is None
+
+
+def _current_frame():
+    return sys._getframe()
+
+
+def test_sampler_reuses_folded_stacks():
+    sampler = StackSampler(1, 1)
+    frame = _current_frame()
+    first = sampler._fold(threading.get_ident(), frame)
+    second = sampler._fold(threading.get_ident(), frame)
+
+    assert first is second
+    assert first.startswith(f"{threading.current_thread().name};")
+    code = _current_frame.__code__
+    assert first.endswith(f"_current_frame ({os.path.basename(__file__)}:{code.co_firstlineno})")
+
+    now = time.perf_counter()
+    sampler._record(now, [first, first])
+    sampler._record(now + 10, [second])
+    assert sampler.collect(now, now)[first] == 2
+    assert sampler.collect(now - 1, now + 11)[first] == 3
+
+
+@pytest.fixture
+def profiled_app(profiler, monkeypatch):
+    monkeypatch.setattr(profiler, "slow_request_ms", 50)
+    monkeypatch.setattr(profiler, "sample_rate", 0)
+    monkeypatch.setattr(profiler, "sampler", StackSampler(1, 5))
+
+    app = FastAPI()
+    app.middleware("http")(profiling_middleware)
+
+    @app.on_event("startup")
+    async def start_profiler():
+        profiler.start()
+
+    @app.on_event("shutdown")
+    async def stop_profiler():
+        profiler.stop()
+
+    @app.get("/slow")
+    async def slow_endpoint():
+        with stage("busy"):
+            deadline = time.perf_counter() + 0.15
+            while time.perf_counter() < deadline:
+                sum(range(1000))
+        return {}
+
+    @app.get("/fast")
+    async def fast_endpoint():
+        return {}
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_middleware_captures_slow_request(profiled_app, profiler, tmp_path):
+    response = profiled_app.get("/slow", headers={"X-Request-ID": "client-req_1"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "client-req_1"
+    capture_id = response.headers["X-Profile-ID"]
+
+    with open(tmp_path / f"{capture_id}.json") as f:
+        capture = json.load(f)
+    assert capture["request_id"] == "client-req_1"
+    assert capture["reason"] == "slow"
+    assert capture["path"] == "/slow"
+    assert capture["stages_ms"]["busy"] >= 150
+    assert capture["samples"] > 0
+
+    folded = profiler.read_folded(capture_id)
+    assert folded
+    assert "slow_endpoint" in folded
+
+
+def test_middleware_replaces_invalid_request_id(profiled_app):
+    response = profiled_app.get("/fast", headers={"X-Request-ID": "not valid!"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] != "not valid!"
+    assert profiling_module._CAPTURE_ID.match(response.headers["X-Request-ID"])
+    assert "X-Profile-ID" not in response.headers
+
+
+def test_admin_disabled_without_token(profiler, client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+    assert client.get("/api/admin/profiles").status_code == 403
+    assert client.get("/api/admin/profiles", headers={"X-Admin-Token": ""}).status_code == 403
+
+
+def test_admin_requires_matching_token(profiler, client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    capture_id = _capture(profiler)["capture_id"]
+
+    assert client.get("/api/admin/profiles").status_code == 403
+    assert client.get("/api/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    headers = {"X-Admin-Token": "secret"}
+    response = client.get("/api/admin/profiles", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["captures"][0]["capture_id"] == capture_id
+    assert client.get(f"/api/admin/profiles/{capture_id}", headers=headers).status_code == 200
+    assert client.get("/api/admin/profiles/unknown", headers=headers).status_code == 404
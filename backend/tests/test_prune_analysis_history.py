@@ -0,0 +1,107 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.models import AnalysisHistory
+from app.scripts.prune_analysis_history import prune_analysis_history
+
+TOTAL_ROWS = 20000
+RETENTION_DAYS = 90
+# One row per hour going back ~2.3 years; the half-hour offset keeps rows
+# off the exact cutoff. Rows 0..2159 are inside the retention window.
+KEPT_ROWS = RETENTION_DAYS * 24
+OLD_ROWS = TOTAL_ROWS - KEPT_ROWS
+
+
+@pytest.fixture
+def history(clean_tables):
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "session_id": f"session-{i % 250}",
+            "image_hash": f"{i:064x}",
+            "extracted_text": "Ingredients: water, glycerin, sodium chloride",
+            "ingredients_found": ["water", "glycerin", "sodium chloride"],
+            "analysis_result": {"overall_rating": "safe", "warnings": []},
+            "confidence_score": 0.9,
+            "created_at": now - timedelta(hours=i + 0.5),
+        }
+        for i in range(TOTAL_ROWS)
+    ]
+    # Insert newest-last so ids don't follow created_at order
+    rows.reverse()
+    with clean_tables.begin() as conn:
+        conn.execute(AnalysisHistory.__table__.insert(), rows)
+    return clean_tables
+
+
+def _remaining(engine):
+    table = AnalysisHistory.__table__
+    with engine.connect() as conn:
+        return conn.execute(
+            select(func.count(), func.min(table.c.created_at)).select_from(table)
+        ).one()
+
+
+def _archived(path):
+    with gzip.open(path, "rt") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_prune_in_batches_with_archive(history, tmp_path):
+    archive_dir = str(tmp_path / "archive")
+
+    result = prune_analysis_history(
+        days=RETENTION_DAYS, batch_size=500, archive=True,
+        archive_dir=archive_dir, pause=0, max_batches=4
+    )
+    assert result["pruned"] == 2000
+    assert result["batches"] == 4
+    count, oldest_left = _remaining(history)
+    assert count == TOTAL_ROWS - 2000
+
+    archived = _archived(result["archive"])
+    assert len(archived) == 2000
+    # Oldest rows go first
+    newest_archived = max(row["created_at"] for row in archived)
+    assert newest_archived < oldest_left.isoformat()
+
+    result = prune_analysis_history(
+        days=RETENTION_DAYS, batch_size=500, archive=True,
+        archive_dir=archive_dir, pause=0
+    )
+    assert result["pruned"] == OLD_ROWS - 2000
+    assert result["batches"] == -(-(OLD_ROWS - 2000) // 500)
+    assert _remaining(history)[0] == KEPT_ROWS
+
+    # Both runs append to the same day's archive as separate gzip members
+    archived = _archived(result["archive"])
+    assert len(archived) == OLD_ROWS
+    assert len({row["id"] for row in archived}) == OLD_ROWS
+    assert os.listdir(archive_dir) == [os.path.basename(result["archive"])]
+
+
+def test_dry_run_only_counts(history, tmp_path):
+    result = prune_analysis_history(
+        days=RETENTION_DAYS, batch_size=500, archive=True,
+        archive_dir=str(tmp_path / "archive"), pause=0, dry_run=True
+    )
+    assert result["eligible"] == OLD_ROWS
+    assert result["pruned"] == 0
+    assert _remaining(history)[0] == TOTAL_ROWS
+    assert not (tmp_path / "archive").exists()
+
+
+def test_delete_without_archive(history, tmp_path):
+    result = prune_analysis_history(
+        days=RETENTION_DAYS, batch_size=1000, archive=False,
+        archive_dir=str(tmp_path / "archive"), pause=0
+    )
+    assert result["pruned"] == OLD_ROWS
+    assert result["archive"] is None
+    assert _remaining(history)[0] == KEPT_ROWS
+    assert not (tmp_path / "archive").exists()